@@ -11,6 +11,7 @@ import numpy as np
 # 自作モジュールのインポート
 import video_pyTegotaeCPG as vPCPG
 import SMDwPO as swp
+import trajectory_pyTegotaeCPG as tPCPG
 
 # シミュレーションのパラメータ設定
 m = 0.10 # ボディの質量 [kg] 
@@ -57,6 +58,45 @@ def run_simulation(max_t, dt, params, times):
     return video_p
 
 
+def run_simulation_to_file(max_t, dt, params, times, path, chunk_t=1.0, dtype='float64'):
+    """
+    シミュレーションを区間ごとに実行し、結果を逐次ファイルへ書き出す関数。
+    全時間の結果をメモリに保持しないため、長時間のシミュレーションにも使える。
+
+    Parameters:
+        max_t   : float  シミュレーションの最大時間
+        dt      : float  時間ステップ
+        params  : list   システムのパラメータ
+        times   : int    記録の間引き間隔（1 で全ステップを記録）
+        path    : str    出力ファイルのパス
+        chunk_t : float  1回の odeint で計算する時間 [s]
+        dtype   : str    記録のデータ型 ('float32' または 'float64')
+    """
+
+    # ヘッダには実行前のパラメータを保存（params は DynamicalSystem 内で書き換えられる）
+    header_params = list(params)
+
+    # 全ステップ数（run_simulation の np.arange と同じ）
+    n_steps = len(np.arange(0.0, max_t, dt))
+
+    # 区間のステップ数を間引き間隔の倍数にそろえる
+    chunk_steps = max(1, int(round(chunk_t / dt)) // times) * times
+
+    # 初期状態を格納
+    p0 = [1.0, 0.0, 0.0*np.pi, 0.0]
+
+    with tPCPG.TrajectoryWriter(path, dt*times, header_params, dtype=dtype) as writer:
+        for start in range(0, n_steps, chunk_steps):
+            stop = min(start + chunk_steps, n_steps)
+
+            # 区間の終端を次の区間の初期状態とするため 1 ステップ余分に計算
+            t = np.arange(start, stop + 1) * dt
+            p = odeint(swp.DynamicalSystem, p0, t, args=(params,))
+            p0 = p[-1]
+
+            writer.append(t[:-1:times], p[:-1:times])
+
+
 if __name__ == '__main__':
 
     video_p = run_simulation(max_t, dt, params, times)
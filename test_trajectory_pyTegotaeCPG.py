@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+# test_trajectory_pyTegotaeCPG.py
+# Copyright (c) 2025 Dai Owaki <owaki@tohoku.ac.jp>
+# ver. 2025.2.11.
+#
+# 軌道データファイルの書き込み・読み込みの確認（python -m pytest で実行）
+
+import os
+
+import numpy as np
+import pytest
+
+import pyTegotaeCPG_odeint as PCPG
+import trajectory_pyTegotaeCPG as tPCPG
+import video_pyTegotaeCPG as vPCPG
+
+
+def write_random(path, n, dt, dtype, index_every, chunk=37, t0=0.0):
+    # 乱数の状態変数を chunk レコードずつ追記し、書き込んだ値を返す
+    t = t0 + np.arange(n) * dt
+    p = np.random.default_rng(0).standard_normal((n, 4))
+    with tPCPG.TrajectoryWriter(path, dt, PCPG.params, dtype=dtype, index_every=index_every) as writer:
+        for start in range(0, n, chunk):
+            writer.append(t[start:start + chunk], p[start:start + chunk])
+    return t, p
+
+
+@pytest.mark.parametrize('dtype', ['float32', 'float64'])
+def test_round_trip(tmp_path, dtype):
+    path = str(tmp_path / 'a.traj')
+    t, p = write_random(path, 500, 0.01, dtype, index_every=16)
+
+    traj = tPCPG.open_trajectory(path)
+    assert len(traj) == 500
+    assert traj.dt == 0.01
+    assert traj.params == list(PCPG.params)
+    assert traj.states.dtype == np.dtype(dtype)
+    np.testing.assert_array_equal(traj.time, t)
+    np.testing.assert_array_equal(traj.states, p.astype(dtype))
+    np.testing.assert_array_equal(traj.index[:, 1], np.arange(0, 500, 16))
+
+
+def test_time_is_exact_for_long_float32_runs(tmp_path):
+    # float32 では 2048 s 以降で dt=1e-4 の時刻が重なるため、時刻は float64 で保存される
+    path = str(tmp_path / 'a.traj')
+    t, p = write_random(path, 20000, 1e-4, 'float32', index_every=4096, chunk=5000, t0=3000.0)
+
+    traj = tPCPG.open_trajectory(path)
+    assert len(np.unique(traj.time)) == 20000
+    assert traj.seek(t[5000]) == 5000
+
+
+@pytest.mark.parametrize('dtype', ['float32', 'float64'])
+def test_seek_and_window_at_block_boundaries(tmp_path, dtype):
+    path = str(tmp_path / 'a.traj')
+    t, p = write_random(path, 20, 0.1, dtype, index_every=4)
+    traj = tPCPG.open_trajectory(path)
+
+    for k in range(20):
+        assert traj.seek(t[k]) == k
+        assert traj.seek(t[k] + 0.05) == k + 1
+    assert traj.seek(-1.0) == 0
+    assert traj.seek(100.0) == 20
+
+    # 区間 [t_start, t_end) の端がブロック境界に一致する場合
+    tw, xw = traj.window(t[4], t[12])
+    np.testing.assert_array_equal(tw, t[4:12])
+    np.testing.assert_array_equal(xw, p[4:12].astype(dtype))
+
+    tw, xw = traj.window(t[3] + 0.05, None)
+    np.testing.assert_array_equal(tw, t[4:])
+
+
+@pytest.mark.parametrize('damage', ['remove', 'truncate'])
+def test_index_is_rebuilt(tmp_path, damage):
+    path = str(tmp_path / 'a.traj')
+    t, p = write_random(path, 100, 0.01, 'float64', index_every=8)
+    expected = tPCPG.open_trajectory(path).index
+
+    if damage == 'remove':
+        os.remove(tPCPG.index_path(path))
+    else:
+        with open(tPCPG.index_path(path), 'r+b') as f:
+            f.truncate(5 * 16 + 3)
+
+    traj = tPCPG.open_trajectory(path)
+    np.testing.assert_array_equal(traj.index, expected)
+    assert traj.seek(t[57]) == 57
+
+
+def test_partial_record_is_ignored(tmp_path):
+    path = str(tmp_path / 'a.traj')
+    write_random(path, 50, 0.01, 'float32', index_every=8)
+    with open(path, 'ab') as f:
+        f.write(b'\0' * 5)
+
+    assert len(tPCPG.open_trajectory(path)) == 50
+
+
+def test_damaged_header_is_rejected(tmp_path):
+    path = str(tmp_path / 'a.traj')
+    write_random(path, 50, 0.01, 'float64', index_every=8)
+
+    # index_every を 0 に書き換える
+    with open(path, 'r+b') as f:
+        f.seek(tPCPG._HEADER_FIXED - 8)
+        f.write(b'\0' * 8)
+
+    with pytest.raises(ValueError):
+        tPCPG.open_trajectory(path)
+
+
+def test_close_releases_memmap(tmp_path):
+    path = str(tmp_path / 'a.traj')
+    write_random(path, 50, 0.01, 'float64', index_every=8)
+
+    with tPCPG.open_trajectory(path) as traj:
+        assert isinstance(traj.data, np.memmap)
+    assert not isinstance(traj.data, np.memmap)
+    assert len(traj) == 0
+
+    # 再生後に同じパスへ書き直せること
+    t, p = write_random(path, 20, 0.1, 'float32', index_every=4)
+    with tPCPG.open_trajectory(path) as traj:
+        np.testing.assert_array_equal(traj.time, t)
+
+
+def test_run_simulation_to_file_matches_run_simulation(tmp_path):
+    path = str(tmp_path / 'a.traj')
+    max_t, dt, times = 2.0, PCPG.dt, PCPG.times
+
+    video_p = PCPG.run_simulation(max_t, dt, list(PCPG.params), times)
+    PCPG.run_simulation_to_file(max_t, dt, list(PCPG.params), times, path, chunk_t=0.5)
+
+    traj = tPCPG.open_trajectory(path)
+    assert traj.dt == pytest.approx(dt * times)
+    assert traj.params == list(PCPG.params)
+    np.testing.assert_allclose(traj.time, np.arange(len(video_p)) * dt * times)
+
+    # 区間ごとに odeint を再開するため、わずかな差（~1e-6）が生じる
+    np.testing.assert_allclose(traj.states, video_p, rtol=0, atol=1e-4)
+
+
+def test_video_file_rejects_short_windows(tmp_path):
+    path = str(tmp_path / 'a.traj')
+    write_random(path, 100, 0.01, 'float64', index_every=8)
+
+    with pytest.raises(ValueError):
+        vPCPG.video_file(path, 0.5, 0.505)
+    with pytest.raises(ValueError):
+        vPCPG.video_file(path, 0.5, 0.5)
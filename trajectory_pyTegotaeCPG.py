@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+# trajectory_pyTegotaeCPG.py
+# Copyright (c) 2025 Dai Owaki <owaki@tohoku.ac.jp>
+# ver. 2025.2.11.
+#
+# 軌道データ（シミュレーション結果）の追記型ファイルフォーマット
+#
+# 本体ファイル（*.traj）:
+#   [ヘッダ 256 bytes] パラメータ・記録間隔・データ型など
+#   [レコード列]       固定長レコード (t, x, y, phi, dphi) を追記
+#                      t は常に float64、状態変数は float32 / float64 を選択できる
+# 索引ファイル（*.traj.idx）:
+#   index_every レコードごとに (時刻, レコード番号) を float64 で追記（粗い時間索引）
+#
+# レコード数はファイルサイズから求めるため、書き込み中にヘッダを書き換える必要はない。
+
+import os
+import struct
+
+import numpy as np
+
+
+MAGIC = b'TGCPGTRJ'  # ファイル識別子
+VERSION = 1          # フォーマットのバージョン
+HEADER_SIZE = 256    # ヘッダサイズ [bytes]（レコード列の開始位置）
+N_COLS = 5           # 1レコードの列数 (t, x, y, phi, dphi)
+
+# ヘッダ固定部: magic, version, itemsize（状態変数）, n_cols, n_params, dt, index_every
+_HEADER_FMT = '<8sIIIIdQ'
+_HEADER_FIXED = struct.calcsize(_HEADER_FMT)
+MAX_PARAMS = (HEADER_SIZE - _HEADER_FIXED) // 8  # ヘッダに格納できるパラメータ数
+
+_DTYPES = {4: np.dtype('<f4'), 8: np.dtype('<f8')}
+
+
+def record_dtype(dtype):
+    """
+    1レコードの構造化データ型を返す関数。
+    時刻は長時間・高分解能でも丸めで重ならないよう、常に float64 で保存する。
+    """
+    return np.dtype([('t', '<f8'), ('p', dtype, (N_COLS - 1,))])
+
+
+def index_path(path):
+    """本体ファイルに対応する索引ファイルのパスを返す関数。"""
+    return path + '.idx'
+
+
+class TrajectoryWriter:
+    """
+    軌道データを逐次ファイルへ追記するクラス。
+
+    Parameters:
+        path        : str    出力ファイルのパス
+        dt          : float  レコードの時間間隔
+        params      : list   システムのパラメータ（ヘッダに保存）
+        dtype       : str    状態変数のデータ型 ('float32' または 'float64')
+        index_every : int    粗い時間索引を記録するレコード間隔
+    """
+
+    def __init__(self, path, dt, params, dtype='float64', index_every=4096):
+        dtype = np.dtype(dtype).newbyteorder('<')
+        if dtype not in _DTYPES.values():
+            raise ValueError('dtype must be float32 or float64: {}'.format(dtype))
+        if len(params) > MAX_PARAMS:
+            raise ValueError('too many params for header: {} > {}'.format(len(params), MAX_PARAMS))
+        if index_every < 1:
+            raise ValueError('index_every must be positive: {}'.format(index_every))
+
+        self.path = path
+        self.dt = float(dt)
+        self.dtype = dtype
+        self.index_every = int(index_every)
+        self.n_records = 0
+
+        # ヘッダの書き込み（パラメータは常に float64 で保存）
+        header = struct.pack(_HEADER_FMT, MAGIC, VERSION, dtype.itemsize, N_COLS,
+                             len(params), self.dt, self.index_every)
+        header += np.asarray(params, dtype='<f8').tobytes()
+        header = header.ljust(HEADER_SIZE, b'\0')
+
+        self._f = open(path, 'wb')
+        self._f.write(header)
+        self._fi = open(index_path(path), 'wb')
+
+    def append(self, t, p):
+        """
+        レコードを追記する関数。
+
+        Parameters:
+            t : ndarray 時刻の配列 (n,)
+            p : ndarray 状態変数の配列 (n, 4)
+        """
+        t = np.asarray(t, dtype='<f8').reshape(-1)
+        p = np.asarray(p, dtype='<f8').reshape(len(t), N_COLS - 1)
+
+        records = np.empty(len(t), dtype=record_dtype(self.dtype))
+        records['t'] = t
+        records['p'] = p
+        self._f.write(records.tobytes())
+
+        # 索引の追記（index_every の倍数番目のレコード）
+        first = -(-self.n_records // self.index_every) * self.index_every
+        rec = np.arange(first, self.n_records + len(t), self.index_every)
+        if len(rec) > 0:
+            entries = np.column_stack((t[rec - self.n_records], rec)).astype('<f8')
+            self._fi.write(entries.tobytes())
+
+        self.n_records += len(t)
+
+    def flush(self):
+        self._f.flush()
+        self._fi.flush()
+
+    def close(self):
+        self._f.close()
+        self._fi.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Trajectory:
+    """
+    軌道データファイルをメモリマップで読み込むクラス。
+    データはコピーされず、アクセスした範囲のみがディスクから読まれる。
+
+    Attributes:
+        params : list    システムのパラメータ
+        dt     : float   レコードの時間間隔
+        data   : ndarray (n,) の構造化メモリマップ ('t': 時刻, 'p': 状態変数)
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError('truncated trajectory header: {}'.format(path))
+
+        magic, version, itemsize, n_cols, n_params, dt, index_every = \
+            struct.unpack_from(_HEADER_FMT, header)
+        if magic != MAGIC:
+            raise ValueError('not a trajectory file: {}'.format(path))
+        if version != VERSION:
+            raise ValueError('unsupported trajectory version: {}'.format(version))
+        if itemsize not in _DTYPES or n_cols != N_COLS or index_every < 1:
+            raise ValueError('unsupported record layout: {}'.format(path))
+
+        self.path = path
+        self.dt = dt
+        self.index_every = index_every
+        self.dtype = _DTYPES[itemsize]
+        self.params = np.frombuffer(header, dtype='<f8', count=n_params,
+                                    offset=_HEADER_FIXED).tolist()
+
+        # 書き込み途中の不完全なレコードは無視する
+        rec_dtype = record_dtype(self.dtype)
+        n = (os.path.getsize(path) - HEADER_SIZE) // rec_dtype.itemsize
+        if n > 0:
+            self.data = np.memmap(path, dtype=rec_dtype, mode='r',
+                                  offset=HEADER_SIZE, shape=(n,))
+        else:
+            self.data = np.empty(0, dtype=rec_dtype)
+
+        self.index = self._load_index(n)
+
+    def _load_index(self, n):
+        # 索引ファイルを読み込み、欠損している場合は本体から再構築する
+        n_entries = -(-n // self.index_every)
+        try:
+            index = np.fromfile(index_path(self.path), dtype='<f8')
+            index = index[:len(index) // 2 * 2].reshape(-1, 2)
+        except OSError:
+            index = np.empty((0, 2))
+        if len(index) < n_entries:
+            rec = np.arange(0, n, self.index_every)
+            index = np.column_stack((self.data['t'][rec], rec))
+        return index[:n_entries]
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def time(self):
+        """時刻の配列（メモリマップのビュー）"""
+        return self.data['t']
+
+    @property
+    def states(self):
+        """状態変数 (x, y, phi, dphi) の配列（メモリマップのビュー）"""
+        return self.data['p']
+
+    def seek(self, t):
+        """
+        時刻 t 以降の最初のレコード番号を返す関数。
+        粗い索引で区間を絞り込み、その区間内のみを二分探索する。
+        """
+        if len(self.index) == 0:
+            return 0
+        k = np.searchsorted(self.index[:, 0], t, side='right') - 1
+        if k < 0:
+            return 0
+        lo = int(self.index[k, 1])
+        hi = min(lo + self.index_every, len(self.data))
+        return lo + int(np.searchsorted(self.data['t'][lo:hi], t, side='left'))
+
+    def window(self, t_start=None, t_end=None):
+        """
+        時間区間 [t_start, t_end) の状態変数をコピーせずに返す関数。
+
+        Parameters:
+            t_start : float  区間の開始時刻（None で先頭から）
+            t_end   : float  区間の終了時刻（None で末尾まで）
+
+        Returns:
+            t : ndarray 区間内の時刻 (n,)
+            x : ndarray 区間内の状態変数 (n, 4)
+        """
+        i0 = 0 if t_start is None else self.seek(t_start)
+        i1 = len(self.data) if t_end is None else self.seek(t_end)
+        return self.time[i0:i1], self.states[i0:i1]
+
+    def close(self):
+        """
+        メモリマップへの参照を手放す関数。
+        window() などで取り出したビューがすべて破棄された時点でファイルが解放される。
+        """
+        self.data = np.empty(0, dtype=self.data.dtype)
+        self.index = np.empty((0, 2))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_trajectory(path):
+    """軌道データファイルを開く関数。"""
+    return Trajectory(path)
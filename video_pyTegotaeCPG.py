@@ -13,9 +13,10 @@ import matplotlib.colors as mcolors
 import matplotlib.animation as animation
 
 import SMDwPO as swp  # バネ-ダンパー系のシミュレーションを含むモジュール
+import trajectory_pyTegotaeCPG as tPCPG  # 軌道データファイルの読み書きを含むモジュール
 
 
-def video(x, dt, max_t, params):
+def video(x, dt, max_t, params, t0=0.0):
     """
     シミュレーション結果を動画として可視化する関数。
     
@@ -24,6 +25,7 @@ def video(x, dt, max_t, params):
         dt     : float   シミュレーションの時間ステップ
         max_t  : float   シミュレーションの総時間
         params : list    システムのパラメータ
+        t0     : float   表示区間の開始時刻
     """
     
     # パラメータの取得
@@ -34,16 +36,17 @@ def video(x, dt, max_t, params):
     Sigma = params[10] # フィードバックの係数
     Phase = params[11] # フェーズオフセット
 
-    # 時間リストの作成
-    time = np.arange(0.0, max_t, dt)
+    # 時間リストの作成（フレーム数は状態変数の長さに合わせる）
+    n_frames = len(x)
+    time = t0 + dt * np.arange(n_frames)
     
     # 力、フィードバック、パワーを格納する配列の作成
-    force = np.empty(int(max_t/dt))
-    feedback = np.empty(int(max_t/dt))
-    power = np.empty(int(max_t/dt))
+    force = np.empty(n_frames)
+    feedback = np.empty(n_frames)
+    power = np.empty(n_frames)
 
     # シミュレーション結果を解析
-    for j in range(int(max_t/dt)):
+    for j in range(n_frames):
         
         # フィードバック計算（バネの伸びが閾値 l 以下の場合のみ）
         if x[j, 0] <= l:
@@ -61,13 +64,14 @@ def video(x, dt, max_t, params):
         power[j] = force[j] * x[j, 1]
 
     # 高さの解析用データの準備
-    half_max = int(max_t / (2 * dt))
-    full_max = int(max_t / dt)
+    half_max = n_frames // 2
+    full_max = n_frames
     data = np.empty(half_max)
     sum_power = 0
     
     period = 6 * np.pi / Omega  # 1周期の時間
-    period_int = int(period / dt)  # 1周期の時間ステップ数
+    # 1周期の時間ステップ数（区間の後半が1周期より短い場合、Ec は後半全体の平均となる）
+    period_int = max(1, min(int(period / dt), n_frames - half_max))
 
     for j in range(half_max):
         data[j] = x[half_max + j, 0]
@@ -120,14 +124,14 @@ def video(x, dt, max_t, params):
     line_lim2_phase = plt.plot([0.0, radius * np.cos(Phase + Dur)], [0.0, radius * np.sin(Phase + Dur)], '-', color='magenta', lw=2, alpha=0.5, animated=False)
 
     # ax2（時間変化の可視化エリア）の設定
-    ax2 = fig.add_subplot(gs[0, 1:3], xlim=(0, max_t), ylim=(-1.5, 1.5))
+    ax2 = fig.add_subplot(gs[0, 1:3], xlim=(t0, t0 + max_t), ylim=(-1.5, 1.5))
     ax2.set_xlabel('time [s]')
     ax2.set_ylabel('Phase: sin( phi )')
     ax2.grid()
 
     # データ系列の描画
     line10, = plt.plot(time, np.sin(x[:, 2]), 'r-', lw=2, alpha=0.5)
-    line_2y0, = plt.plot((0, max_t), (0, 0), 'k-', lw=1, alpha=1., animated=False)
+    line_2y0, = plt.plot((t0, t0 + max_t), (0, 0), 'k-', lw=1, alpha=1., animated=False)
     line_feedback = plt.fill_between(time, 0.00 * feedback, 0.30 * feedback, color='c', alpha=0.5)
 
     # 時間バーの描画（アニメーション）
@@ -158,23 +162,23 @@ def video(x, dt, max_t, params):
     position1, = plt.plot([], [], 'go', markersize=30, animated=True)
 
     # ax4エリアの設定
-    ax4 = fig.add_subplot(gs[1,1:3], xlim=(0, max_t), ylim=(0, 2.0))
+    ax4 = fig.add_subplot(gs[1,1:3], xlim=(t0, t0 + max_t), ylim=(0, 2.0))
     ax4.set_xlabel('time [s]')  # x軸ラベル（時間）
     ax4.set_ylabel('Height: y [m]')  # y軸ラベル（高さ）
     ax4.grid()  # グリッドを表示
 
     # 線のプロット（高さデータ、基準線、力の影響範囲など）
     line_m1, = plt.plot(time, x[:,0], 'g-', lw=2, alpha=0.5)  # 高さの推移
-    line_m0, = plt.plot((0, max_t), (1, 1), 'k-', lw=1, alpha=1., animated=False)  # 基準線
+    line_m0, = plt.plot((t0, t0 + max_t), (1, 1), 'k-', lw=1, alpha=1., animated=False)  # 基準線
     line_force = plt.fill_between(time, 0.0*force, 0.5*force, color='m', alpha=0.3)  # 力の影響範囲
-    line_aveh, = plt.plot((0, max_t), (AveHeight, AveHeight), 'b--', lw=2, alpha=1., animated=False)  # 平均高さのライン
+    line_aveh, = plt.plot((t0, t0 + max_t), (AveHeight, AveHeight), 'b--', lw=2, alpha=1., animated=False)  # 平均高さのライン
 
     # アニメーション用のバーとマーカー
     bar2, = plt.plot([], [], 'b-', lw=1, animated=True)  # 時間バー
     pm1, = plt.plot([], [], 'go', markersize=10, animated=True)  # ポイントマーカー
 
     # 平均高さのテキスト表示
-    ave_text = ax4.text(0.55*max_t, 2.1, 'Averaged height={:.2f} m'.format(AveHeight), color='blue')
+    ave_text = ax4.text(t0 + 0.55*max_t, 2.1, 'Averaged height={:.2f} m'.format(AveHeight), color='blue')
     # ave_text = ax4.text(0.15*max_t, 2.1, 'ave={:.2f}, max-min={:.2f}, Ec={:.2f}, Ee={:.4f}'.format(AveHeight,MaxHeight-MinHeight,Ec,(MaxHeight-MinHeight)/Ec), color='blue')
 
     plt.tight_layout()  # グラフのレイアウトを調整
@@ -233,3 +237,24 @@ def video(x, dt, max_t, params):
     #ani.save('pyTegotaeCPG.mp4', writer='ffmpeg')  # アニメーションを保存（コメントアウト）
 
     plt.show()  # グラフを表示
+
+
+def video_file(path, t_start=None, t_end=None):
+    """
+    軌道データファイルの指定した時間区間を動画として可視化する関数。
+    ファイル全体は読み込まず、区間内のデータのみをメモリマップから参照する。
+
+    Parameters:
+        path    : str    軌道データファイルのパス
+        t_start : float  表示区間の開始時刻（None で先頭から）
+        t_end   : float  表示区間の終了時刻（None で末尾まで）
+    """
+
+    with tPCPG.open_trajectory(path) as traj:
+        t, x = traj.window(t_start, t_end)
+
+        # 高さの統計量の計算には 2 レコード以上が必要
+        if len(x) < 2:
+            raise ValueError('fewer than 2 records in the requested time window')
+
+        video(x, traj.dt, len(x) * traj.dt, traj.params, t0=float(t[0]))